@@ -0,0 +1,95 @@
+"""
+Memory and routing benchmark for large command registries.
+
+Registers N dynamic commands (like per-guild custom tags) through the
+decorator and through Handler.add_commands, and reports the memory used
+per command, the registration time and the routing time per lookup.
+Each mode and size runs in a fresh interpreter so earlier runs do not
+affect the allocator state or interned strings of later ones.
+
+Usage:
+    python benchmarks/registry_memory.py [N ...]
+"""
+import gc
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from botcontroller import Handler
+
+
+class FakeClient:
+    user = None
+
+    def event(self, func):
+        return func
+
+
+async def tag(ctx, text: str):
+    pass
+
+
+def make_specs(count: int):
+    return [(f"tag{i}", "Custom tag", tag, [f"t{i}"]) for i in range(count)]
+
+
+def register_with_decorator(handler: Handler, specs):
+    for name, description, func, aliases in specs:
+        handler.command(name, description, aliases)(func)
+
+
+def register_in_bulk(handler: Handler, specs):
+    handler.add_commands(specs)
+
+
+def measure(count: int, register):
+    specs = make_specs(count)
+    gc.collect()
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    handler = Handler(FakeClient(), "!")
+    register(handler, specs)
+    elapsed = time.perf_counter() - started
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    names = [spec[0] for spec in specs[:: max(1, count // 1000)]]
+    started = time.perf_counter()
+    for name in names:
+        handler.registry.match(name + " hello")
+    lookup = (time.perf_counter() - started) / len(names)
+
+    return (after - before) / count, peak - before, elapsed, lookup
+
+
+MODES = {"decorator": register_with_decorator, "bulk": register_in_bulk}
+
+
+def run(mode: str, count: int):
+    per_command, peak, elapsed, lookup = measure(count, MODES[mode])
+    print(per_command, peak, elapsed, lookup)
+
+
+def main(counts):
+    print(f"{'commands':>10} {'mode':>10} {'bytes/cmd':>10} {'peak MiB':>9} {'register s':>11} {'lookup us':>10}")
+    for count in counts:
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--run", mode, str(count)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            per_command, peak, elapsed, lookup = map(float, output.split())
+            print(f"{count:>10} {mode:>10} {per_command:>10.0f} {peak / 2 ** 20:>9.1f} {elapsed:>11.3f} {lookup * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        run(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
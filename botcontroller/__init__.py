@@ -1,12 +1,25 @@
 from .main import Handler
-from .enums import DiscordPermissions, Event
+from .command import Command
+from .enums import DiscordPermissions, Event, MiddlewareStage
+from .guilds import GuildOverlay, GuildOverrides, GuildRestriction
+from .context import Context
+from .tracing import Tracer, InMemorySpanExporter, SpanExportHandler
 from .custom_exceptions import CommandNotFound, ExceptionDuringCommand, ArgumentCastingError, InvalidPermissions
 #from .decorators import command, event, role_restricted, user_restricted, channel_restricted, server_restricted, permission_restricted
 
 __all__ = [
     "Handler",
+    "Command",
+    "Context",
     "DiscordPermissions",
     "Event",
+    "MiddlewareStage",
+    "GuildOverlay",
+    "GuildOverrides",
+    "GuildRestriction",
+    "Tracer",
+    "InMemorySpanExporter",
+    "SpanExportHandler",
     "CommandNotFound",
     "ExceptionDuringCommand",
     "ArgumentCastingError",
@@ -1,8 +1,29 @@
-from dataclasses import dataclass, field
-from typing import Any, Callable, List
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from .parsing import Parsing
 
-@dataclass
+_SHARED_PARAM_TYPES: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+
+
+def shared_param_types(param_types: Iterable[Any]) -> Tuple[Any, ...]:
+    """
+    Get a tuple of parameter types shared by every command with the same signature.
+
+    Args:
+        param_types: The parameter types of a command function.
+
+    Returns:
+        The shared tuple.
+    """
+    param_types = tuple(param_types)
+    try:
+        return _SHARED_PARAM_TYPES.setdefault(param_types, param_types)
+    except TypeError:
+        return param_types
+
+
+@dataclass(frozen=True, slots=True)
 class Command:
     """
     Represents a command that can be executed by the user.
@@ -11,32 +32,196 @@ class Command:
         name: The name of the command.
         description: A brief description of the command.
         function: The function to be executed when the command is called.
-        aliases: A list of aliases for the command.
-        param_types: A list of parameter types for the command function.
+        aliases: The names the command can be invoked with, starting with its name.
+            A single string is taken as one alias.
+        param_types: The parameter types for the command function.
     """
     name: str
     description: str
     function: Callable
-    aliases: List[str] = field(default_factory=list)
-    param_types: List[Any] = field(default_factory=list)
+    aliases: Tuple[str, ...] = ()
+    param_types: Tuple[Any, ...] = ()
 
     def __post_init__(self):
-        self.aliases.append(self.name)
-        self.aliases = list(set(self.aliases))
-    
+        name = sys.intern(self.name)
+        aliases = (self.aliases,) if isinstance(self.aliases, str) else self.aliases or ()
+        aliases = dict.fromkeys(sys.intern(alias) for alias in (name, *aliases))
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "aliases", tuple(aliases))
+        object.__setattr__(self, "param_types", shared_param_types(self.param_types or ()))
+
     def __call__(self, *args, **kwargs):
         return self.function(*args, **kwargs)
 
-async def add_command(commands: list, name: str, description: str, function: Callable, aliases: List[str] = None):
+    @classmethod
+    def from_function(cls, name: str, description: str, function: Callable, aliases: Iterable[str] = ()) -> "Command":
+        """
+        Create a command, guessing its parameter types from the function signature.
+
+        Args:
+            name: The name of the command.
+            description: A brief description of the command.
+            function: The function to be executed when the command is called.
+            aliases: A list of aliases for the command, or a single alias.
+        """
+        return cls(name, description, function, aliases, Parsing.param_types(function))
+
+
+class CommandRegistry:
+    """
+    Registered commands and the index used to route messages to them.
+
+    Registering a command under an existing name replaces the previous one,
+    including its aliases. When two commands share an alias, the one
+    registered last owns it, and the previous owner gets it back when that
+    command is removed.
+    """
+
+    def __init__(self):
+        self._commands: Dict[str, Command] = {}
+        self._index: Dict[str, Command] = {}
+        self._shadowed: Dict[str, List[Command]] = {}
+        self._length_counts: Dict[int, int] = {}
+        self._alias_lengths: Tuple[int, ...] = ()
+
+    @property
+    def commands(self) -> List[Command]:
+        """
+        The registered commands, in registration order.
+        """
+        return list(self._commands.values())
+
+    def __len__(self):
+        return len(self._commands)
+
+    def __iter__(self):
+        return iter(self._commands.values())
+
+    def __contains__(self, name: str):
+        return name in self._commands
+
+    def add(self, cmd: Command):
+        """
+        Register a command.
+
+        Args:
+            cmd: The command object.
+        """
+        self.add_many((cmd,))
+
+    def add_many(self, commands: Iterable[Command]):
+        """
+        Register several commands, updating the routing index once.
+
+        Args:
+            commands: The command objects.
+        """
+        for cmd in commands:
+            previous = self._commands.pop(cmd.name, None)
+            if previous is not None:
+                self._unindex(previous)
+            self._commands[cmd.name] = cmd
+            for alias in cmd.aliases:
+                owner = self._index.get(alias)
+                if owner is None:
+                    self._length_counts[len(alias)] = self._length_counts.get(len(alias), 0) + 1
+                else:
+                    self._shadowed.setdefault(alias, []).append(owner)
+                self._index[alias] = cmd
+        self._update_lengths()
+
+    def remove(self, name: str) -> Optional[Command]:
+        """
+        Remove a command and its aliases.
+
+        Args:
+            name: The name of the command.
+
+        Returns:
+            The removed command, or None if no command has that name.
+        """
+        removed = self.remove_many((name,))
+        return removed[0] if removed else None
+
+    def remove_many(self, names: Iterable[str]) -> List[Command]:
+        """
+        Remove several commands, updating the routing index once.
+
+        Args:
+            names: The names of the commands.
+
+        Returns:
+            The removed commands. Unknown names are ignored.
+        """
+        removed = []
+        for name in names:
+            cmd = self._commands.pop(name, None)
+            if cmd is not None:
+                self._unindex(cmd)
+                removed.append(cmd)
+        self._update_lengths()
+        return removed
+
+    def _unindex(self, cmd: Command):
+        for alias in cmd.aliases:
+            shadowed = self._shadowed.get(alias)
+            if self._index.get(alias) is not cmd:
+                if shadowed is not None:
+                    shadowed[:] = [other for other in shadowed if other is not cmd]
+                    if not shadowed:
+                        del self._shadowed[alias]
+            elif shadowed:
+                self._index[alias] = shadowed.pop()
+                if not shadowed:
+                    del self._shadowed[alias]
+            else:
+                del self._index[alias]
+                count = self._length_counts[len(alias)] - 1
+                if count:
+                    self._length_counts[len(alias)] = count
+                else:
+                    del self._length_counts[len(alias)]
+
+    def _update_lengths(self):
+        self._alias_lengths = tuple(sorted(self._length_counts, reverse=True))
+
+    def get(self, name: str) -> Optional[Command]:
+        """
+        Get a command by its name or one of its aliases.
+
+        Args:
+            name: The name or alias.
+        """
+        return self._index.get(name)
+
+    def match(self, content: str) -> Optional[str]:
+        """
+        Find the longest registered name or alias the content starts with.
+
+        Args:
+            content: The message content without its prefix.
+
+        Returns:
+            The matched name or alias, or None.
+        """
+        index = self._index
+        for length in self._alias_lengths:
+            candidate = content[:length]
+            if len(candidate) == length and candidate in index:
+                return candidate
+        return None
+
+
+async def add_command(registry: CommandRegistry, name: str, description: str, function: Callable, aliases: List[str] = None):
     """
     Add a command to the bot.
 
     Args:
+        registry: The command registry of the handler.
         name: The name of the command.
         description: A brief description of the command.
         function: The function to be executed when the command is called.
         aliases: A list of aliases for the command.
     """
 
-    param_types = Parsing.param_types(function)
-    commands.append(Command(name, description, function, aliases, param_types))
+    registry.add(Command.from_function(name, description, function, aliases or ()))
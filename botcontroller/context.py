@@ -0,0 +1,139 @@
+import time
+from typing import List, Optional
+
+from discord import Message
+
+_UNSET = object()
+
+
+class Context:
+    """
+    Represents a single command invocation.
+
+    Contexts are taken from a ContextPool and recycled once the invocation
+    has finished, so commands must not keep a reference to them afterwards.
+
+    Attributes:
+        message: The message that triggered the invocation.
+        handler: The handler processing the message.
+        prefix: The prefix the message started with.
+        command: The resolved command, or None when no command matched.
+        invoked_with: The name or alias used to invoke the command.
+        args: The converted arguments passed to the command.
+        started_at: The ``time.perf_counter`` value when the invocation started.
+    """
+    __slots__ = (
+        "message", "handler", "prefix", "command", "invoked_with", "args",
+        "started_at", "_guild", "_author_permissions", "_reply",
+    )
+
+    def __init__(self):
+        self._clear()
+
+    def _reset(self, handler, message: Message, prefix: Optional[str]):
+        self.message = message
+        self.handler = handler
+        self.prefix = prefix
+        self.started_at = time.perf_counter()
+
+    def _clear(self):
+        self.message = None
+        self.handler = None
+        self.prefix = None
+        self.command = None
+        self.invoked_with = None
+        self.args = ()
+        self.started_at = 0.0
+        self._guild = _UNSET
+        self._author_permissions = _UNSET
+        self._reply = _UNSET
+
+    @property
+    def author(self):
+        return self.message.author
+
+    @property
+    def channel(self):
+        return self.message.channel
+
+    @property
+    def content(self) -> str:
+        return self.message.content
+
+    @property
+    def guild(self):
+        """
+        The guild the message was sent in, or None for direct messages.
+        """
+        if self._guild is _UNSET:
+            self._guild = self.message.guild
+        return self._guild
+
+    @property
+    def author_permissions(self):
+        """
+        The guild permissions of the author, or None for direct messages.
+        """
+        if self._author_permissions is _UNSET:
+            self._author_permissions = getattr(self.message.author, "guild_permissions", None)
+        return self._author_permissions
+
+    @property
+    def reply(self):
+        """
+        Coroutine function replying to the message, like ``Message.reply``.
+        """
+        if self._reply is _UNSET:
+            self._reply = self.message.reply
+        return self._reply
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Seconds elapsed since the invocation started.
+        """
+        return time.perf_counter() - self.started_at
+
+    def __repr__(self):
+        command_name = self.command.name if self.command else None
+        return f"<Context command={command_name!r} invoked_with={self.invoked_with!r} prefix={self.prefix!r}>"
+
+
+class ContextPool:
+    """
+    Free-list of Context objects reused across invocations.
+
+    Attributes:
+        max_size: The maximum number of idle contexts kept for reuse.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._free: List[Context] = []
+
+    def acquire(self, handler, message: Message, prefix: Optional[str]) -> Context:
+        """
+        Get a context for a new invocation.
+
+        Args:
+            handler: The handler processing the message.
+            message: The message object.
+            prefix: The prefix the message started with.
+
+        Returns:
+            A reset context.
+        """
+        ctx = self._free.pop() if self._free else Context()
+        ctx._reset(handler, message, prefix)
+        return ctx
+
+    def release(self, ctx: Context):
+        """
+        Return a context to the pool once its invocation has finished.
+
+        Args:
+            ctx: The context to release.
+        """
+        ctx._clear()
+        if len(self._free) < self.max_size:
+            self._free.append(ctx)
@@ -83,3 +83,16 @@ class Event(enum.Enum):
             if item.value == value:
                 return item
         raise ValueError(f"Unknown event name '{value}'")
+
+
+class MiddlewareStage(enum.Enum):
+    """
+    Enum class representing the stages middlewares can run at.
+    """
+    BeforeRouting = "before_routing"
+    BeforeConvert = "before_convert"
+    BeforeExecute = "before_execute"
+    AfterExecute = "after_execute"
+
+    def __str__(self):
+        return self.value
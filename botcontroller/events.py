@@ -2,6 +2,7 @@ from typing import Callable
 
 from .custom_exceptions import CommandNotFound, ExceptionDuringCommand, ArgumentCastingError, InvalidPermissions
 from .enums import Event
+from .tracing import span
 
 class EventManager:
     """
@@ -44,11 +45,8 @@ class EventManager:
             *args: Variable length argument list.
             **kwargs: Arbitrary keyword arguments.
         """
-        print("hey" + event_name)
         new_event_name = event_name.value if isinstance(event_name, Event) else event_name
         if new_event_name in self.events:
-            print("hey")
-            print(self.events)
             if self.events[new_event_name] == []:
                 if event_name == 'CommandNotFound':
                     raise CommandNotFound(f"Command not found")
@@ -60,8 +58,9 @@ class EventManager:
                     raise InvalidPermissions(f"Invalid permissions")
                 else:
                     raise ValueError(f"Unknown event name '{new_event_name}'")
-            for function in self.events[new_event_name]:
-                await function(*args, **kwargs)
+            with span("event." + new_event_name, handlers=len(self.events[new_event_name])):
+                for function in self.events[new_event_name]:
+                    await function(*args, **kwargs)
         else:
             raise ValueError(f"Unknown event name '{new_event_name}'")
     
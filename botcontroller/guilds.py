@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, FrozenSet, Optional, Tuple
+
+from discord import Message
+
+from .enums import DiscordPermissions
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class GuildRestriction:
+    """
+    Per-guild restriction applied to a command before its arguments are converted.
+
+    Empty fields are not checked.
+
+    Attributes:
+        roles: Role IDs of which the author must hold at least one.
+        users: User IDs allowed to run the command.
+        channels: Channel IDs the command may be run in.
+        permissions: Permissions the author must have.
+    """
+    roles: FrozenSet[int] = frozenset()
+    users: FrozenSet[int] = frozenset()
+    channels: FrozenSet[int] = frozenset()
+    permissions: Tuple[DiscordPermissions, ...] = ()
+
+    def check(self, message: Message) -> Optional[Tuple[str, object]]:
+        """
+        Check a message against the restriction.
+
+        Args:
+            message: The message object.
+
+        Returns:
+            None if the message passes, otherwise a ``(permission_type, requirement)``
+            tuple matching the arguments of the InvalidPermissions event.
+        """
+        if self.users and message.author.id not in self.users:
+            return 'USER', self.users
+        if self.channels and message.channel.id not in self.channels:
+            return 'CHANNEL', self.channels
+        if self.roles and not any(role.id in self.roles for role in getattr(message.author, 'roles', ())):
+            return 'ROLE', self.roles
+        if self.permissions:
+            author_permissions = getattr(message.author, 'guild_permissions', None)
+            for permission in self.permissions:
+                if author_permissions is None or not getattr(author_permissions, permission.value):
+                    return 'PERMISSION', permission
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class GuildOverrides:
+    """
+    Overlay applied on top of the command registry for a single guild.
+
+    Attributes:
+        disabled: Names of commands that are disabled in the guild.
+        aliases: Guild specific triggers mapped to the command name they run.
+            Mapping a trigger to None hides it, which together with a new
+            alias allows a command to be renamed.
+        restrictions: Command names mapped to an extra restriction.
+
+    Overrides are indexed when created, so build new ones and pass them to
+    GuildOverlay.set instead of mutating them.
+    """
+    disabled: FrozenSet[str] = frozenset()
+    aliases: Dict[str, Optional[str]] = field(default_factory=dict)
+    restrictions: Dict[str, GuildRestriction] = field(default_factory=dict)
+    _alias_lengths: Tuple[int, ...] = field(init=False, repr=False, compare=False, default=())
+
+    def __post_init__(self):
+        object.__setattr__(self, "_alias_lengths", tuple(sorted({len(alias) for alias in self.aliases}, reverse=True)))
+
+    def match(self, content: str) -> Optional[str]:
+        """
+        Find the longest guild trigger the content starts with.
+
+        Args:
+            content: The message content without its prefix.
+
+        Returns:
+            The matched trigger, or None.
+        """
+        aliases = self.aliases
+        for length in self._alias_lengths:
+            candidate = content[:length]
+            if len(candidate) == length and candidate in aliases:
+                return candidate
+        return None
+
+
+EMPTY_OVERRIDES = GuildOverrides()
+
+OverridesLoader = Callable[[int], Awaitable[Optional[GuildOverrides]]]
+
+
+class GuildOverlay:
+    """
+    Bounded cache of guild overrides, loaded lazily from a pluggable source.
+
+    Concurrent messages from an uncached guild share a single load. If the
+    loader raises, the error is logged and the guild gets no overrides
+    until the next attempt.
+
+    Attributes:
+        loader: Coroutine function returning the overrides of a guild ID, or None.
+        max_size: The maximum number of guilds kept in the cache.
+    """
+
+    def __init__(self, loader: Optional[OverridesLoader] = None, max_size: int = 1024):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.loader = loader
+        self.max_size = max_size
+        self._cache: "OrderedDict[int, GuildOverrides]" = OrderedDict()
+        self._pending: Dict[int, "asyncio.Task[GuildOverrides]"] = {}
+
+    async def get(self, guild_id: int) -> GuildOverrides:
+        """
+        Get the overrides of a guild, loading them when they are not cached.
+
+        Args:
+            guild_id: The guild ID.
+
+        Returns:
+            The guild overrides, or an empty overlay when the guild has none.
+        """
+        overrides = self._cache.get(guild_id)
+        if overrides is not None:
+            self._cache.move_to_end(guild_id)
+            return overrides
+
+        if self.loader is None:
+            return EMPTY_OVERRIDES
+
+        task = self._pending.get(guild_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(guild_id))
+            self._pending[guild_id] = task
+        return await asyncio.shield(task)
+
+    def set(self, guild_id: int, overrides: GuildOverrides):
+        """
+        Set the overrides of a guild.
+
+        Args:
+            guild_id: The guild ID.
+            overrides: The new overrides.
+        """
+        self._pending.pop(guild_id, None)
+        self._store(guild_id, overrides)
+
+    def invalidate(self, guild_id: int = None):
+        """
+        Drop cached overrides so they are reloaded on next use.
+
+        Args:
+            guild_id: The guild ID, or None to clear the whole cache.
+        """
+        if guild_id is None:
+            self._cache.clear()
+            self._pending.clear()
+        else:
+            self._cache.pop(guild_id, None)
+            self._pending.pop(guild_id, None)
+
+    async def _load(self, guild_id: int) -> GuildOverrides:
+        task = asyncio.current_task()
+        try:
+            overrides = await self.loader(guild_id) or EMPTY_OVERRIDES
+        except Exception:
+            logger.exception("Failed to load overrides for guild %s", guild_id)
+            if self._pending.get(guild_id) is task:
+                del self._pending[guild_id]
+            return EMPTY_OVERRIDES
+
+        if self._pending.get(guild_id) is task:
+            del self._pending[guild_id]
+            self._store(guild_id, overrides)
+        return overrides
+
+    def _store(self, guild_id: int, overrides: GuildOverrides):
+        self._cache[guild_id] = overrides
+        self._cache.move_to_end(guild_id)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
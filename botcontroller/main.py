@@ -1,11 +1,15 @@
-from typing import List, Callable, Any, Union
+from typing import Iterable, List, Callable, Any, Optional, Union
 from discord import Client, Message, Guild
 from .restricted import RestrictedManager
 from .enums import Event
-from .command import Command
+from .command import Command, CommandRegistry
 from .parsing import Parsing
 from .events import EventManager
-from .utils import is_command_message, extract_command_info, execute_command
+from .guilds import GuildOverlay, EMPTY_OVERRIDES
+from .context import Context, ContextPool
+from .middleware import MiddlewareManager, run_stage
+from .tracing import Tracer, span
+from .utils import match_prefix, extract_command_info, execute_command
 
 class Handler:
     """
@@ -16,10 +20,14 @@ class Handler:
         prefix: The prefix(es) for commands.
         case_insensitive: Whether command names are case insensitive.
         commands: A list of registered commands.
+        registry: The registered commands and their routing index.
         events: A dictionary of custom events and their handlers.
+        guild_overlay: Per-guild command overrides consulted during routing.
+        tracer: Tracer creating a span per message, disabled by default.
+        message_compat: Pass the raw Message instead of a Context to commands, restrictions and events.
     """
 
-    def __init__(self, app: Client, prefix: Union[str, List[str]], case_insensitive: bool = False):
+    def __init__(self, app: Client, prefix: Union[str, List[str]], case_insensitive: bool = False, guild_overlay: Optional[GuildOverlay] = None, tracer: Optional[Tracer] = None, message_compat: bool = False):
         if not isinstance(prefix, (str, list)) or not all(isinstance(i, str) for i in prefix):
             raise TypeError("prefix must be a string or a list of strings")
 
@@ -29,10 +37,15 @@ class Handler:
         self.app = app
         self.prefix = prefix
         self.case_insensitive = case_insensitive
-        self.commands: List[Command] = []
+        self.registry = CommandRegistry()
+        self.guild_overlay = guild_overlay if guild_overlay is not None else GuildOverlay()
+        self.tracer = tracer if tracer is not None else Tracer(default_rate=0.0)
+        self.message_compat = message_compat
+        self._contexts = ContextPool()
 
         self.EventManager = EventManager()
         self.Restricted = RestrictedManager(self.EventManager)
+        self.Middleware = MiddlewareManager()
 
         self.app.event(self.on_message)
 
@@ -49,18 +62,49 @@ class Handler:
         if message.author == self.app.user:
             return
 
-        if not is_command_message(self.prefix, message):
+        prefix = match_prefix(self.prefix, message)
+        if prefix is None:
             return
 
-        command_name, args = extract_command_info(self.prefix, self.commands, message)
-        if not command_name:
-            await self.EventManager.trigger_event('CommandNotFound', message)
+        ctx = self._contexts.acquire(self, message, prefix)
+        try:
+            with self.tracer.start_span("message", message_id=message.id, guild_id=message.guild.id if message.guild else None):
+                await self._dispatch(ctx, message if self.message_compat else ctx)
+        finally:
+            self._contexts.release(ctx)
+
+    async def _dispatch(self, ctx: Context, invocation: Union[Context, Message]):
+        message = ctx.message
+        before_routing = self.Middleware.before_routing_chain
+        if before_routing and not await run_stage(before_routing, invocation):
+            return
+
+        with span("routing") as routing:
+            overrides = await self.guild_overlay.get(message.guild.id) if message.guild else EMPTY_OVERRIDES
+
+            command_name, trigger, args = extract_command_info(self.prefix, self.registry, message, overrides)
+            cmd = self.registry.get(command_name) if command_name else None
+            routing.set_attribute("command", cmd.name if cmd else None)
+
+        if cmd is None or cmd.name in overrides.disabled:
+            await self.EventManager.trigger_event('CommandNotFound', invocation)
             return
 
+        ctx.command = cmd
+        ctx.invoked_with = trigger
+
+        restriction = overrides.restrictions.get(cmd.name)
+        if restriction is not None:
+            with span("restrictions"):
+                failure = restriction.check(message)
+            if failure is not None:
+                await self.EventManager.trigger_event('InvalidPermissions', failure[0], invocation, failure[1])
+                return
+
         try:
-            await execute_command(self.commands, self.EventManager, message, command_name, args)
+            await execute_command(cmd, self.EventManager, invocation, args, self.Middleware.pipeline(cmd))
         except Exception as e:
-            await self.EventManager.trigger_event('ExceptionDuringCommand', message, self.commands[command_name], e)
+            await self.EventManager.trigger_event('ExceptionDuringCommand', invocation, cmd, e)
 
     def command(self, name: str, description: str, aliases: List[str] = []):
         """
@@ -75,11 +119,60 @@ class Handler:
             The decorator function.
         """
         def decorator(func):
-            param_types = Parsing.param_types(func)
-            self.commands.append(Command(name, description, func, aliases, param_types))
+            cmd = Command.from_function(name, description, func, aliases)
+            self.registry.add(cmd)
+            self.Middleware.invalidate(cmd.name)
             return func
         return decorator
 
+    def add_commands(self, commands: Iterable[Union[Command, tuple]]):
+        """
+        Register many commands at once, building the routing index a single time.
+
+        Commands sharing a function only have its signature inspected once.
+
+        Args:
+            commands: Command objects, or ``(name, description, function[, aliases])`` tuples.
+        """
+        param_types_by_function = {}
+        new_commands = []
+        for spec in commands:
+            if not isinstance(spec, Command):
+                name, description, func, *rest = spec
+                param_types = param_types_by_function.get(func)
+                if param_types is None:
+                    param_types = param_types_by_function[func] = Parsing.param_types(func)
+                spec = Command(name, description, func, rest[0] if rest else (), param_types)
+            new_commands.append(spec)
+
+        self.registry.add_many(new_commands)
+        self.Middleware.invalidate()
+
+    @property
+    def commands(self) -> List[Command]:
+        """
+        A snapshot of the registered commands, in registration order.
+
+        Changing the returned list does not register or remove commands; use
+        ``command``, ``add_commands`` and ``remove_commands`` instead.
+        """
+        return self.registry.commands
+
+    def remove_commands(self, names: Iterable[str]) -> List[Command]:
+        """
+        Remove commands and their aliases, updating the routing index once.
+
+        Args:
+            names: The names of the commands.
+
+        Returns:
+            The removed commands.
+        """
+        removed = self.registry.remove_many(names)
+        for cmd in removed:
+            self.Middleware.invalidate(cmd.name)
+        return removed
+
     def event(self, event_name: Union[str, Event]):
         """
         Decorator to register an event handler.
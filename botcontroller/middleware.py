@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from .command import Command
+from .enums import MiddlewareStage
+
+
+@dataclass(frozen=True, slots=True)
+class Middleware:
+    """
+    A registered middleware.
+
+    Attributes:
+        function: Coroutine function receiving the invocation. Returning False stops the pipeline.
+        commands: Names of the commands the middleware applies to, or None for all commands.
+        predicate: Function deciding from a Command whether the middleware applies to it.
+    """
+    function: Callable
+    commands: Optional[FrozenSet[str]] = None
+    predicate: Optional[Callable[[Command], bool]] = None
+
+    def applies_to(self, cmd: Command) -> bool:
+        if self.commands is not None and cmd.name not in self.commands:
+            return False
+        return self.predicate is None or bool(self.predicate(cmd))
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPipeline:
+    """
+    The middlewares that apply to a command, flattened per stage.
+    """
+    before_convert: Tuple[Callable, ...] = ()
+    before_execute: Tuple[Callable, ...] = ()
+    after_execute: Tuple[Callable, ...] = ()
+
+
+EMPTY_PIPELINE = CompiledPipeline()
+
+
+async def run_stage(functions: Tuple[Callable, ...], invocation) -> bool:
+    """
+    Run the middlewares of a stage in order.
+
+    Args:
+        functions: The compiled middlewares of the stage.
+        invocation: The context, or the message object in compatibility mode.
+
+    Returns:
+        False if a middleware short-circuited the pipeline, otherwise True.
+    """
+    for function in functions:
+        if await function(invocation) is False:
+            return False
+    return True
+
+
+class MiddlewareManager:
+    """
+    Registers middlewares and compiles them into a flat pipeline per command.
+
+    Pipelines are compiled the first time a command runs and are dropped
+    whenever a middleware or the command itself is registered again, so
+    middlewares that do not apply to a command are never checked at runtime.
+
+    Returning False from an after_execute middleware also skips the
+    CommandReceived event, so it can mark a completed command as handled.
+    """
+
+    def __init__(self):
+        self.middlewares: Dict[MiddlewareStage, List[Middleware]] = {stage: [] for stage in MiddlewareStage}
+        self.before_routing_chain: Tuple[Callable, ...] = ()
+        self._pipelines: Dict[str, CompiledPipeline] = {}
+
+    def add(self, stage: Union[str, MiddlewareStage], function: Callable, commands: Iterable[str] = None, predicate: Callable[[Command], bool] = None):
+        """
+        Add a middleware.
+
+        Args:
+            stage: The stage to run the middleware at.
+            function: The middleware coroutine function.
+            commands: Names of the commands the middleware applies to, or a single name.
+            predicate: Function deciding from a Command whether the middleware applies to it.
+        """
+        stage = MiddlewareStage(stage)
+        if stage is MiddlewareStage.BeforeRouting and (commands is not None or predicate is not None):
+            raise ValueError("before_routing middlewares run before a command is known and cannot be filtered")
+
+        if isinstance(commands, str):
+            commands = (commands,)
+
+        self.middlewares[stage].append(Middleware(function, frozenset(commands) if commands is not None else None, predicate))
+        self.before_routing_chain = tuple(m.function for m in self.middlewares[MiddlewareStage.BeforeRouting])
+        self._pipelines.clear()
+
+    def remove(self, stage: Union[str, MiddlewareStage], function: Callable):
+        """
+        Remove a middleware.
+
+        Args:
+            stage: The stage the middleware runs at.
+            function: The middleware coroutine function.
+        """
+        stage = MiddlewareStage(stage)
+        self.middlewares[stage] = [m for m in self.middlewares[stage] if m.function is not function]
+        self.before_routing_chain = tuple(m.function for m in self.middlewares[MiddlewareStage.BeforeRouting])
+        self._pipelines.clear()
+
+    def invalidate(self, command_name: str = None):
+        """
+        Drop compiled pipelines after the command registry changed.
+
+        Args:
+            command_name: The name of the changed command, or None for all commands.
+        """
+        if command_name is None:
+            self._pipelines.clear()
+        else:
+            self._pipelines.pop(command_name, None)
+
+    def pipeline(self, cmd: Command) -> CompiledPipeline:
+        """
+        Get the compiled pipeline of a command.
+
+        Args:
+            cmd: The command object.
+        """
+        pipeline = self._pipelines.get(cmd.name)
+        if pipeline is None:
+            pipeline = self._compile(cmd)
+            self._pipelines[cmd.name] = pipeline
+        return pipeline
+
+    def _compile(self, cmd: Command) -> CompiledPipeline:
+        stages = [
+            tuple(m.function for m in self.middlewares[stage] if m.applies_to(cmd))
+            for stage in (MiddlewareStage.BeforeConvert, MiddlewareStage.BeforeExecute, MiddlewareStage.AfterExecute)
+        ]
+        if not any(stages):
+            return EMPTY_PIPELINE
+        return CompiledPipeline(*stages)
+
+    def _decorator(self, stage: MiddlewareStage, commands: Iterable[str] = None, predicate: Callable[[Command], bool] = None):
+        def decorator(func):
+            self.add(stage, func, commands, predicate)
+            return func
+        return decorator
+
+    def before_routing(self):
+        """
+        Decorator to register a middleware run for every command message, before routing.
+
+        Returns:
+            The decorator function.
+        """
+        return self._decorator(MiddlewareStage.BeforeRouting)
+
+    def before_convert(self, commands: List[str] = None, predicate: Callable[[Command], bool] = None):
+        """
+        Decorator to register a middleware run before the arguments are converted.
+
+        Args:
+            commands: Names of the commands the middleware applies to.
+            predicate: Function deciding from a Command whether the middleware applies to it.
+
+        Returns:
+            The decorator function.
+        """
+        return self._decorator(MiddlewareStage.BeforeConvert, commands, predicate)
+
+    def before_execute(self, commands: List[str] = None, predicate: Callable[[Command], bool] = None):
+        """
+        Decorator to register a middleware run after conversion, before the command.
+
+        Args:
+            commands: Names of the commands the middleware applies to.
+            predicate: Function deciding from a Command whether the middleware applies to it.
+
+        Returns:
+            The decorator function.
+        """
+        return self._decorator(MiddlewareStage.BeforeExecute, commands, predicate)
+
+    def after_execute(self, commands: List[str] = None, predicate: Callable[[Command], bool] = None):
+        """
+        Decorator to register a middleware run after the command completed.
+
+        Args:
+            commands: Names of the commands the middleware applies to.
+            predicate: Function deciding from a Command whether the middleware applies to it.
+
+        Returns:
+            The decorator function.
+        """
+        return self._decorator(MiddlewareStage.AfterExecute, commands, predicate)
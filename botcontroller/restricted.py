@@ -1,5 +1,9 @@
+import functools
+
 from .enums import DiscordPermissions
 from .events import EventManager
+from .context import Context
+from .tracing import span
 from discord import Role as discord_Role, Message
 
 class RestrictedManager():
@@ -17,8 +21,11 @@ class RestrictedManager():
             The decorator function.
         """
         def decorator(func):
+            @functools.wraps(func)
             async def wrapper(message: Message, *args):
-                if role in message.author.roles:
+                with span("restrictions", type='ROLE'):
+                    allowed = role in message.author.roles
+                if allowed:
                     await func(message, *args)
                 else:
                     await self.EventManager.trigger_event('InvalidPermissions', 'ROLE', message, role)
@@ -39,8 +46,11 @@ class RestrictedManager():
             raise TypeError("user_id must be a list of integers")
 
         def decorator(func):
+            @functools.wraps(func)
             async def wrapper(message: Message, *args):
-                if message.author.id in user_id:
+                with span("restrictions", type='USER'):
+                    allowed = message.author.id in user_id
+                if allowed:
                     await func(message, *args)
                 else:
                     await self.EventManager.trigger_event('InvalidPermissions', 'USER', message, user_id)
@@ -61,8 +71,11 @@ class RestrictedManager():
             raise TypeError("channel_id must be a list of integers")
 
         def decorator(func):
+            @functools.wraps(func)
             async def wrapper(message: Message, *args):
-                if message.channel.id in channel_id:
+                with span("restrictions", type='CHANNEL'):
+                    allowed = message.channel.id in channel_id
+                if allowed:
                     await func(message, *args)
                 else:
                     await self.EventManager.trigger_event('InvalidPermissions', 'CHANNEL', message, channel_id)
@@ -83,8 +96,11 @@ class RestrictedManager():
             raise TypeError("server_id must be a list of integers")
 
         def decorator(func):
+            @functools.wraps(func)
             async def wrapper(message: Message, *args):
-                if message.guild.id in server_id:
+                with span("restrictions", type='SERVER'):
+                    allowed = message.guild.id in server_id
+                if allowed:
                     await func(message, *args)
                 else:
                     await self.EventManager.trigger_event('InvalidPermissions', 'SERVER', message, server_id)
@@ -105,12 +121,18 @@ class RestrictedManager():
             raise TypeError("permissions must be a list of DiscordPermissions")
 
         def decorator(func):
+            @functools.wraps(func)
             async def wrapper(message: Message, *args):
-                author_permissions = message.author.guild_permissions
-                for permission in permissions:
-                    if not getattr(author_permissions, permission.value):
-                        await self.EventManager.trigger_event('InvalidPermissions', 'PERMISSION', message, permission)
-                        return
+                with span("restrictions", type='PERMISSION'):
+                    if isinstance(message, Context):
+                        author_permissions = message.author_permissions
+                    else:
+                        author_permissions = message.author.guild_permissions
+                    missing = next((permission for permission in permissions if not getattr(author_permissions, permission.value)), None)
+
+                if missing is not None:
+                    await self.EventManager.trigger_event('InvalidPermissions', 'PERMISSION', message, missing)
+                    return
 
                 await func(message, *args)
 
@@ -0,0 +1,400 @@
+import logging
+import queue
+import random
+import time
+import traceback
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    from opentelemetry.sdk.trace import ReadableSpan
+    from opentelemetry.sdk.trace.export import SpanExporter
+    from opentelemetry.trace import SpanContext, Status, StatusCode, TraceFlags
+except ImportError:
+    SpanExporter = None
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("botcontroller_span", default=None)
+
+
+class _NoopSpan:
+    """
+    Span returned when tracing is disabled or the trace was not sampled.
+    """
+    __slots__ = ()
+
+    sampled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """
+    A timed unit of work belonging to a trace.
+
+    All spans created while handling one message share the same trace ID,
+    which serves as the correlation ID of that message.
+
+    Attributes:
+        tracer: The tracer that created the span.
+        name: The name of the span.
+        trace_id: The correlation ID shared by the whole trace.
+        span_id: The ID of the span.
+        parent_id: The ID of the parent span, or None for the root span.
+        attributes: Additional data attached to the span.
+        start_time: Start time in nanoseconds since the epoch.
+        end_time: End time in nanoseconds since the epoch.
+        status: "OK", or "ERROR" if an exception escaped the span.
+    """
+    __slots__ = (
+        "tracer", "name", "trace_id", "span_id", "parent_id",
+        "attributes", "start_time", "end_time", "status", "_token",
+    )
+
+    sampled = True
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = 0
+        self.end_time = 0
+        self.status = "OK"
+        self._token = None
+
+    def __enter__(self):
+        self.start_time = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_time = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.status = "ERROR"
+            self.attributes["exception"] = repr(exc)
+        self.tracer._finish(self)
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        """
+        Attach data to the span.
+
+        Args:
+            key: The attribute name.
+            value: The attribute value.
+        """
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_time - self.start_time) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the span to a dictionary using OpenTelemetry field names.
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_time,
+            "end_time_unix_nano": self.end_time,
+            "attributes": dict(self.attributes),
+            "status": self.status,
+        }
+
+    def to_otel(self) -> "ReadableSpan":
+        """
+        Convert the span to an OpenTelemetry SDK ``ReadableSpan``.
+
+        Requires the ``opentelemetry-sdk`` package. Attributes that are None
+        are dropped and values OpenTelemetry cannot store are converted with repr.
+        """
+        if SpanExporter is None:
+            raise RuntimeError("opentelemetry-sdk is required to convert spans")
+
+        trace_id = int(self.trace_id, 16)
+        flags = TraceFlags(TraceFlags.SAMPLED)
+        parent = None
+        if self.parent_id is not None:
+            parent = SpanContext(trace_id, int(self.parent_id, 16), is_remote=False, trace_flags=flags)
+
+        return ReadableSpan(
+            name=self.name,
+            context=SpanContext(trace_id, int(self.span_id, 16), is_remote=False, trace_flags=flags),
+            parent=parent,
+            attributes={
+                key: value if isinstance(value, (str, bool, int, float)) else repr(value)
+                for key, value in self.attributes.items()
+                if value is not None
+            },
+            status=Status(StatusCode.ERROR if self.status == "ERROR" else StatusCode.UNSET),
+            start_time=self.start_time,
+            end_time=self.end_time,
+        )
+
+
+def current_span():
+    """
+    Get the span that is currently active, or a no-op span.
+    """
+    return _current_span.get() or NOOP_SPAN
+
+
+def span(name: str, **attributes):
+    """
+    Start a child of the currently active span.
+
+    Args:
+        name: The name of the span.
+        **attributes: Data attached to the span.
+
+    Returns:
+        The new span, or a no-op span when there is no sampled trace.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+
+    tracer = parent.tracer
+    if not tracer._sample(name, 1.0):
+        return NOOP_SPAN
+
+    return Span(tracer, name, parent.trace_id, parent.span_id, attributes)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+
+    Records are dropped and counted instead of blocking when the queue is full.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BoundedQueueListener(QueueListener):
+    """
+    Queue listener that waits for room in a bounded queue to stop.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class Tracer:
+    """
+    Creates spans and writes finished ones to a queue-backed logger.
+
+    Spans are logged as DEBUG records carrying the span in ``record.span``.
+    Once started, records are pushed onto a queue and formatted by a
+    background listener, so the handlers never block the event loop. The
+    queue is bounded: when the listener falls behind, new records are
+    dropped and counted in ``dropped_records`` rather than using unbounded memory.
+
+    Attributes:
+        sample_rates: Span names mapped to the fraction of spans kept.
+        default_rate: Sample rate of root spans without an entry in sample_rates.
+            Child spans without an entry follow their parent.
+        logger: The logger spans are written to.
+        handlers: The handlers run by the background listener, a StreamHandler if empty.
+        max_queue_size: The maximum number of records waiting for the listener.
+    """
+
+    def __init__(self, sample_rates: Dict[str, float] = None, default_rate: float = 1.0, handlers: List[logging.Handler] = None, logger_name: str = "botcontroller.tracing", max_queue_size: int = 10_000):
+        self.sample_rates = dict(sample_rates or {})
+        self.default_rate = default_rate
+        self.logger = logging.getLogger(logger_name)
+        self.handlers = list(handlers or [])
+        self.max_queue_size = max_queue_size
+        self.dropped_records = 0
+        self._listener: Optional[_BoundedQueueListener] = None
+        self._queue_handler: Optional[_DeferredQueueHandler] = None
+        self._logger_state = (logging.NOTSET, True)
+
+    def start(self):
+        """
+        Attach the queue handler and start the background listener.
+        """
+        if self._listener is not None:
+            return
+
+        log_queue = queue.Queue(self.max_queue_size)
+        self._queue_handler = _DeferredQueueHandler(log_queue)
+        self._listener = _BoundedQueueListener(log_queue, *(self.handlers or [logging.StreamHandler()]), respect_handler_level=True)
+
+        self._logger_state = (self.logger.level, self.logger.propagate)
+        self.logger.addHandler(self._queue_handler)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self._listener.start()
+
+    def stop(self):
+        """
+        Flush pending records, stop the background listener and restore the
+        logger level and propagation set before ``start``.
+        """
+        if self._listener is None:
+            return
+
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.flush()
+        self.dropped_records += self._queue_handler.dropped
+        self.logger.removeHandler(self._queue_handler)
+        level, self.logger.propagate = self._logger_state
+        self.logger.setLevel(level)
+        self._listener = None
+        self._queue_handler = None
+
+    def start_span(self, name: str, **attributes):
+        """
+        Start a new trace.
+
+        Args:
+            name: The name of the root span.
+            **attributes: Data attached to the span.
+
+        Returns:
+            The root span, or a no-op span when the trace is not sampled.
+        """
+        if not self._sample(name, self.default_rate):
+            return NOOP_SPAN
+
+        return Span(self, name, f"{random.getrandbits(128):032x}", None, attributes)
+
+    def _sample(self, name: str, default: float) -> bool:
+        rate = self.sample_rates.get(name, default)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        return random.random() < rate
+
+    def _finish(self, span: Span):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "%s trace=%s span=%s duration=%.3fms status=%s",
+                span.name, span.trace_id, span.span_id, span.duration_ms, span.status,
+                extra={"span": span},
+            )
+
+
+class InMemorySpanExporter:
+    """
+    Span exporter that keeps finished spans in memory as dictionaries, mainly for tests.
+
+    It does not need OpenTelemetry. To test against the SDK types, use the
+    SDK's own in-memory exporter with SpanExportHandler instead.
+    """
+
+    def __init__(self):
+        self._spans: List[Dict[str, Any]] = []
+        self._stopped = False
+
+    def export(self, spans: Sequence[Dict[str, Any]]):
+        if not self._stopped:
+            self._spans.extend(spans)
+
+    def get_finished_spans(self) -> List[Dict[str, Any]]:
+        return list(self._spans)
+
+    def clear(self):
+        self._spans.clear()
+
+    def shutdown(self):
+        self._stopped = True
+
+
+class SpanExportHandler(logging.Handler):
+    """
+    Logging handler that forwards finished spans to an exporter in batches.
+
+    Add it to the handlers of a Tracer so exporting runs on the background
+    listener. Spans are buffered and exported once ``max_batch_size`` spans
+    are waiting, when a span arrives after ``flush_interval`` seconds since
+    the last export, and on ``flush``/``close``. ``Tracer.stop`` flushes
+    its handlers. OpenTelemetry SDK ``SpanExporter`` instances, such as the OTLP
+    exporter, receive ``ReadableSpan`` objects built with ``Span.to_otel``.
+    Any other exporter receives dictionaries built with ``Span.to_dict``.
+
+    Attributes:
+        exporter: An OpenTelemetry SpanExporter, or any object with an ``export(spans)`` method.
+        max_batch_size: The number of buffered spans that triggers an export.
+        flush_interval: Seconds after which buffered spans are exported with the next span.
+    """
+
+    def __init__(self, exporter, level: int = logging.DEBUG, max_batch_size: int = 512, flush_interval: float = 5.0):
+        super().__init__(level)
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._otel = SpanExporter is not None and isinstance(exporter, SpanExporter)
+        self._buffer: List[Span] = []
+        self._last_export = time.monotonic()
+
+    def emit(self, record: logging.LogRecord):
+        span = getattr(record, "span", None)
+        if span is None:
+            return
+
+        self._buffer.append(span)
+        if len(self._buffer) >= self.max_batch_size or time.monotonic() - self._last_export >= self.flush_interval:
+            try:
+                self._export()
+            except Exception:
+                self.handleError(record)
+
+    def flush(self):
+        """
+        Export every buffered span.
+        """
+        self.acquire()
+        try:
+            self._export()
+        except Exception:
+            if logging.raiseExceptions:
+                traceback.print_exc()
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        shutdown = getattr(self.exporter, "shutdown", None)
+        if shutdown is not None:
+            shutdown()
+        super().close()
+
+    def _export(self):
+        self._last_export = time.monotonic()
+        if not self._buffer:
+            return
+
+        spans, self._buffer = self._buffer, []
+        self.exporter.export([span.to_otel() if self._otel else span.to_dict() for span in spans])
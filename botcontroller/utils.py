@@ -1,19 +1,47 @@
+from typing import Optional, Union
+
 from discord import Message, Role as discord_Role, User as discord_User
 
+from .command import Command, CommandRegistry
+from .context import Context
 from .events import EventManager
+from .guilds import GuildOverrides
+from .middleware import CompiledPipeline, EMPTY_PIPELINE, run_stage
 from .parsing import Parsing
+from .tracing import span
 
 
 def is_command_message(prefix_list, message: Message) -> bool:
     return any(message.content.startswith(prefix) for prefix in prefix_list)
 
-def extract_command_info(prefix_list, commands, message: Message) -> tuple:
+def match_prefix(prefix_list, message: Message) -> Optional[str]:
+    """
+    Get the prefix a message starts with, or None if it is not a command.
+
+    Args:
+        prefix_list: The list of command prefixes.
+        message: The message object.
     """
-    Extract the command name and arguments from a message.
+    content = message.content
+    for prefix in prefix_list:
+        if content.startswith(prefix):
+            return prefix
+    return None
+
+def extract_command_info(prefix_list, registry: CommandRegistry, message: Message, overrides: GuildOverrides = None) -> tuple:
+    """
+    Extract the command name, the trigger used and the arguments from a message.
+
+    The trigger is the name or alias the user typed, which differs from the
+    command name when an alias or guild trigger matched. The longest matching trigger wins. Guild triggers win over registered
+    aliases of the same length, and a guild trigger mapped to None hides
+    only that exact trigger.
 
     Args:
-        
+        prefix_list: The list of command prefixes.
+        registry: The registered commands.
         message: The message object.
+        overrides: The overrides of the guild the message was sent in.
     """
     content = message.content
     for prefix in prefix_list:
@@ -21,60 +49,74 @@ def extract_command_info(prefix_list, commands, message: Message) -> tuple:
             content = content[len(prefix) :].strip()
             break
 
-    command_name = None
-    for cmd in commands:
-        command_start = next(
-            (alias for alias in [cmd.name] + cmd.aliases if content.startswith(alias)),
-            None,
-        )
-        if command_start:
-            command_name = command_start
-            content = content[len(command_name) :].strip()
-            break
+    command_name = registry.match(content)
+    trigger = command_name
+
+    guild_trigger = overrides.match(content) if overrides is not None else None
+    if guild_trigger is not None and (trigger is None or len(guild_trigger) >= len(trigger)):
+        trigger = guild_trigger
+        command_name = overrides.aliases[guild_trigger]
+        if command_name is None:
+            return None, None, []
+
+    if trigger:
+        content = content[len(trigger) :].strip()
 
     args = content.split(" ") if content else []
-    return command_name, args
+    return command_name, trigger, args
 
 
-async def execute_command(commands, event_manager: EventManager, message: Message, command_name: str, args: list):
+async def execute_command(cmd: Command, event_manager: EventManager, message: Union[Context, Message], args: list, pipeline: CompiledPipeline = EMPTY_PIPELINE):
     """
     Execute a command based on the message content.
 
     Args:
-        message: The message object.
-        command_name: The name of the command.
+        cmd: The command resolved during routing.
+        event_manager: The event manager.
+        message: The invocation context, or the message object in compatibility mode.
         args: The arguments for the command.
+        pipeline: The compiled middlewares of the command.
     """
-    for cmd in commands:
-        if cmd.name == command_name or command_name in cmd.aliases:
-            param_types = cmd.param_types if cmd.param_types else []
-
-            if len(args) > len(param_types):
-                args = args[: len(param_types) - 1] + [
-                    " ".join(args[len(param_types) - 1 :])
-                ]
-
-            parsed_args = []
-            for i, arg in enumerate(args):
-                corresponding_type = param_types[i] if i < len(param_types) else str
-                try:
-                    if corresponding_type == discord_Role:
-                        parsed_args.append(Parsing.resolve_role(arg))
-                    elif corresponding_type == discord_User:
-                        parsed_args.append(Parsing.resolve_user(arg))
-                    else:
-                        parsed_args.append(corresponding_type(arg))
-                except ValueError:
-                    await event_manager.trigger_event(
-                        "ArgumentCastingError", message, cmd, arg
-                    )
-                    return
+    if pipeline.before_convert and not await run_stage(pipeline.before_convert, message):
+        return
+
+    param_types = cmd.param_types if cmd.param_types else []
 
+    if len(args) > len(param_types):
+        args = args[: len(param_types) - 1] + [
+            " ".join(args[len(param_types) - 1 :])
+        ]
+
+    with span("conversion", arguments=len(args)):
+        parsed_args = []
+        for i, arg in enumerate(args):
+            corresponding_type = param_types[i] if i < len(param_types) else str
             try:
-                await cmd.function(message, *parsed_args)
-                await event_manager.trigger_event("CommandReceived", message, cmd)
-            except Exception as e:
+                if corresponding_type == discord_Role:
+                    parsed_args.append(Parsing.resolve_role(arg))
+                elif corresponding_type == discord_User:
+                    parsed_args.append(Parsing.resolve_user(arg))
+                else:
+                    parsed_args.append(corresponding_type(arg))
+            except ValueError:
                 await event_manager.trigger_event(
-                    "ExceptionDuringCommand", message, cmd, e
+                    "ArgumentCastingError", message, cmd, arg
                 )
+                return
+
+    if isinstance(message, Context):
+        message.args = parsed_args
+
+    if pipeline.before_execute and not await run_stage(pipeline.before_execute, message):
+        return
+
+    try:
+        with span("execution", command=cmd.name):
+            await cmd.function(message, *parsed_args)
+        if pipeline.after_execute and not await run_stage(pipeline.after_execute, message):
             return
+        await event_manager.trigger_event("CommandReceived", message, cmd)
+    except Exception as e:
+        await event_manager.trigger_event(
+            "ExceptionDuringCommand", message, cmd, e
+        )
@@ -1,5 +1,5 @@
 import discord
-from botcontroller import Handler, Event, DiscordPermissions
+from botcontroller import Handler, Context, Event, DiscordPermissions
 
 intents = discord.Intents.default()
 intents.message_content = True  # Enable message_content intent
@@ -11,16 +11,16 @@ client = discord.Client(
 myHandler = Handler(client, "!")
 
 @myHandler.event(Event.CommandNotFound)
-async def handle_command_not_found(message: discord.Message):
-    await message.channel.send("Command not found.")
+async def handle_command_not_found(ctx: Context):
+    await ctx.channel.send("Command not found.")
 
 @myHandler.Restricted.permission([DiscordPermissions.CHANGE_NICKNAME])
 @myHandler.command("nick", "Change the users nickname")
-async def change_nickname(ctx: discord.Message, user: discord.User, nickname: str):
+async def change_nickname(ctx: Context, user: discord.User, nickname: str):
     await ctx.guild.get_member(user.id).edit(nick=nickname)
 
 @myHandler.command("hello", "Say hello to the bot")
-async def hello(ctx: discord.Message):
+async def hello(ctx: Context):
     await ctx.channel.send("Hello!")
 
 @client.event
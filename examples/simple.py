@@ -1,5 +1,5 @@
 import discord
-from botcontroller import Handler, Command
+from botcontroller import Handler, Context
 
 intents = discord.Intents.default()
 intents.message_content = True  # Enable message_content intent
@@ -11,7 +11,7 @@ client = discord.Client(
 myHandler = Handler(client, "!")
 
 @myHandler.command("hello", "Say hello to the bot")
-async def hello(ctx: discord.Message):
+async def hello(ctx: Context):
     await ctx.channel.send("Hello!")
 
 @client.event
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+from botcontroller import Handler
+
+
+class FakeClient:
+    user = object()
+
+    def event(self, func):
+        return func
+
+
+def make_message(content: str, guild_id: int = 1, channel_id: int = 10, author_id: int = 100, administrator: bool = True):
+    author = SimpleNamespace(
+        id=author_id,
+        roles=[],
+        guild_permissions=SimpleNamespace(administrator=administrator),
+    )
+    return SimpleNamespace(
+        id=1234,
+        content=content,
+        author=author,
+        guild=SimpleNamespace(id=guild_id) if guild_id is not None else None,
+        channel=SimpleNamespace(id=channel_id),
+    )
+
+
+async def make_handler(log: list, **kwargs) -> Handler:
+    """
+    Create a handler whose events append ``(event_name, *args)`` to log.
+    """
+    handler = Handler(FakeClient(), "!", **kwargs)
+    for event_name in handler.EventManager.events:
+        async def record(*args, event_name=event_name):
+            log.append((event_name, *args))
+        await handler.EventManager.add_event(event_name, record)
+    return handler
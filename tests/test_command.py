@@ -0,0 +1,161 @@
+import asyncio
+import unittest
+
+from botcontroller import Command
+from botcontroller.command import CommandRegistry, add_command
+
+from .fakes import make_handler, make_message
+
+
+async def tag(ctx):
+    pass
+
+
+async def other(ctx):
+    pass
+
+
+class CommandTest(unittest.TestCase):
+    def test_aliases_keep_order_and_start_with_name(self):
+        cmd = Command("tag", "Tag", tag, ("b", "a", "tag", "b"))
+        self.assertEqual(cmd.aliases, ("tag", "b", "a"))
+
+    def test_single_string_alias_is_not_split(self):
+        self.assertEqual(Command("tag", "Tag", tag, "tg").aliases, ("tag", "tg"))
+        self.assertEqual(Command.from_function("tag", "Tag", tag, "tg").aliases, ("tag", "tg"))
+
+    def test_identical_signatures_share_param_types(self):
+        async def first(ctx, a: int, b: str):
+            pass
+
+        async def second(ctx, x: int, y: str):
+            pass
+
+        self.assertIs(
+            Command.from_function("first", "", first).param_types,
+            Command.from_function("second", "", second).param_types,
+        )
+
+    def test_commands_are_frozen(self):
+        with self.assertRaises(AttributeError):
+            Command("tag", "Tag", tag).name = "other"
+
+
+class CommandRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = CommandRegistry()
+
+    def test_longest_alias_wins(self):
+        self.registry.add_many([Command("t", "", tag), Command("tags", "", other)])
+        self.assertEqual(self.registry.match("tags list"), "tags")
+        self.assertEqual(self.registry.match("t list"), "t")
+        self.assertIsNone(self.registry.match("x"))
+
+    def test_registering_a_name_again_replaces_the_command(self):
+        old = Command("tag1", "old", tag, ("t1",))
+        new = Command("tag1", "new", other, ("t2",))
+        self.registry.add(old)
+        self.registry.add(new)
+
+        self.assertEqual(self.registry.commands, [new])
+        self.assertIs(self.registry.get("tag1"), new)
+        self.assertIs(self.registry.get("t2"), new)
+        self.assertIsNone(self.registry.get("t1"))
+        self.assertIsNone(self.registry.match("t1"))
+
+    def test_remove_drops_aliases_and_shrinks_lengths(self):
+        self.registry.add_many([
+            Command("a", "", tag),
+            Command("long_name", "", tag, ("ln",)),
+            Command("bb", "", tag),
+        ])
+        removed = self.registry.remove_many(["long_name", "missing"])
+
+        self.assertEqual([cmd.name for cmd in removed], ["long_name"])
+        self.assertEqual([cmd.name for cmd in self.registry], ["a", "bb"])
+        self.assertIsNone(self.registry.get("ln"))
+        self.assertEqual(self.registry._alias_lengths, (2, 1))
+        self.assertIsNone(self.registry.remove("long_name"))
+
+    def test_removing_a_command_keeps_aliases_owned_by_others(self):
+        first = Command("first", "", tag, ("shared",))
+        second = Command("second", "", tag, ("shared",))
+        self.registry.add_many([first, second])
+        self.registry.remove("first")
+        self.assertIs(self.registry.get("shared"), second)
+
+    def test_add_command_registers_in_the_registry(self):
+        asyncio.run(add_command(self.registry, "tag", "", tag, ["t"]))
+        self.assertIs(self.registry.get("t"), self.registry.get("tag"))
+
+    def test_removing_the_owner_restores_the_previous_owner(self):
+        help_cmd = Command("help", "", tag)
+        tag_cmd = Command("tag", "", tag, ("help",))
+        self.registry.add_many([help_cmd, tag_cmd])
+        self.assertIs(self.registry.get("help"), tag_cmd)
+
+        self.registry.remove("tag")
+        self.assertIs(self.registry.get("help"), help_cmd)
+        self.assertEqual(self.registry.match("help me"), "help")
+
+        self.registry.remove("help")
+        self.assertIsNone(self.registry.get("help"))
+        self.assertIsNone(self.registry.match("help me"))
+
+    def test_replacing_the_owner_restores_the_previous_owner(self):
+        help_cmd = Command("help", "", tag)
+        self.registry.add_many([help_cmd, Command("tag", "", tag, ("help",))])
+        self.registry.add(Command("tag", "", tag, ("t",)))
+        self.assertIs(self.registry.get("help"), help_cmd)
+        self.assertEqual(self.registry._shadowed, {})
+
+
+class HandlerRegistrationTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.log = []
+        self.handler = await make_handler(self.log)
+
+    def ran(self):
+        return [entry for entry in self.log if isinstance(entry, str)]
+
+    async def test_bulk_registration_and_removal(self):
+        async def show(ctx):
+            self.log.append(ctx.invoked_with)
+
+        self.handler.add_commands((f"tag{i}x", "Custom tag", show, [f"t{i}x"]) for i in range(100))
+        self.assertEqual(len(self.handler.commands), 100)
+
+        await self.handler.on_message(make_message("!t42x"))
+        self.handler.remove_commands(["tag42x"])
+        await self.handler.on_message(make_message("!t42x"))
+        await self.handler.on_message(make_message("!tag42x"))
+
+        self.assertEqual(self.ran(), ["t42x"])
+        self.assertEqual([entry[0] for entry in self.log if isinstance(entry, tuple)].count("CommandNotFound"), 2)
+
+    async def test_bulk_registration_with_a_single_string_alias(self):
+        async def show(ctx):
+            self.log.append(ctx.invoked_with)
+
+        self.handler.add_commands([("tag", "Custom tag", show, "tg")])
+        await self.handler.on_message(make_message("!tg"))
+        self.assertEqual(self.ran(), ["tg"])
+        self.assertIsNone(self.handler.registry.get("t"))
+
+    async def test_reregistering_routes_to_the_new_function(self):
+        @self.handler.command("tag1", "old", aliases=["t1"])
+        async def old(ctx):
+            self.log.append("old")
+
+        @self.handler.command("tag1", "new", aliases=["t2"])
+        async def new(ctx):
+            self.log.append("new")
+
+        for content in ("!tag1", "!t2", "!t1"):
+            await self.handler.on_message(make_message(content))
+        self.assertEqual(self.ran(), ["new", "new"])
+        self.assertEqual(len(self.handler.commands), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+from botcontroller import Context, GuildOverlay, GuildOverrides
+from botcontroller.context import ContextPool
+
+from .fakes import make_handler, make_message
+
+
+class ContextTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.log = []
+        self.seen = []
+        self.overlay = GuildOverlay()
+        self.handler = await make_handler(self.log, guild_overlay=self.overlay)
+
+        @self.handler.command("add", "Add numbers", aliases=["plus"])
+        async def add(ctx, a: int, b: int):
+            self.seen.append((ctx, ctx.command.name, ctx.invoked_with, ctx.prefix, list(ctx.args)))
+
+    async def test_context_holds_invocation_data(self):
+        await self.handler.on_message(make_message("!plus 1 2"))
+        ctx, name, invoked_with, prefix, args = self.seen[0]
+        self.assertIsInstance(ctx, Context)
+        self.assertEqual((name, invoked_with, prefix, args), ("add", "plus", "!", [1, 2]))
+
+    async def test_invoked_with_is_the_guild_trigger_typed(self):
+        self.overlay.set(1, GuildOverrides(aliases={"sum": "add"}))
+        await self.handler.on_message(make_message("!sum 1 2"))
+        self.assertEqual(self.seen[0][1:3], ("add", "sum"))
+
+    async def test_released_context_is_cleared_and_reused(self):
+        await self.handler.on_message(make_message("!add 1 2"))
+        await self.handler.on_message(make_message("!add 3 4"))
+        first, second = self.seen[0][0], self.seen[1][0]
+
+        self.assertIs(first, second)
+        self.assertIsNone(first.message)
+        self.assertIsNone(first.command)
+        self.assertIsNone(first.invoked_with)
+        self.assertEqual(first.args, ())
+        self.assertEqual(self.seen[1][4], [3, 4])
+
+    async def test_lazy_properties_are_not_carried_over(self):
+        guilds = []
+
+        @self.handler.command("where", "Show the guild")
+        async def where(ctx):
+            guilds.append(ctx.guild.id)
+
+        await self.handler.on_message(make_message("!where", guild_id=1))
+        await self.handler.on_message(make_message("!where", guild_id=2))
+        self.assertEqual(guilds, [1, 2])
+
+
+class ContextPoolTest(unittest.TestCase):
+    def test_pool_is_bounded(self):
+        pool = ContextPool(max_size=1)
+        first = pool.acquire(None, make_message("!a"), "!")
+        second = pool.acquire(None, make_message("!b"), "!")
+        self.assertIsNot(first, second)
+
+        pool.release(first)
+        pool.release(second)
+        self.assertEqual(len(pool._free), 1)
+        self.assertIs(pool.acquire(None, make_message("!c"), "!"), first)
+
+
+class MessageCompatTest(unittest.IsolatedAsyncioTestCase):
+    async def test_raw_message_is_passed_to_commands_restrictions_and_events(self):
+        log = []
+        handler = await make_handler(log, message_compat=True)
+        received = []
+
+        async def allowed(message, a: int):
+            received.append(message)
+
+        async def denied(message):
+            received.append(message)
+
+        handler.command("allowed", "Allowed")(handler.Restricted.user([100])(allowed))
+        handler.command("denied", "Denied")(handler.Restricted.user([5])(denied))
+
+        allowed_message = make_message("!allowed 1")
+        denied_message = make_message("!denied")
+        missing_message = make_message("!missing")
+        for message in (allowed_message, denied_message, missing_message):
+            await handler.on_message(message)
+
+        self.assertEqual(received, [allowed_message])
+        events = {}
+        for entry in log:
+            events.setdefault(entry[0], entry)
+        self.assertIs(events["CommandReceived"][1], allowed_message)
+        self.assertIs(events["InvalidPermissions"][2], denied_message)
+        self.assertIs(events["CommandNotFound"][1], missing_message)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+
+from botcontroller import GuildOverlay, GuildOverrides, GuildRestriction
+
+from .fakes import make_handler, make_message
+
+
+class GuildOverridesRoutingTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.log = []
+        self.overlay = GuildOverlay()
+        self.handler = await make_handler(self.log, guild_overlay=self.overlay)
+
+        @self.handler.command("tags", "List tags")
+        async def tags(ctx):
+            self.log.append("tags")
+
+        @self.handler.command("hello", "Say hello")
+        async def hello(ctx):
+            self.log.append("hello")
+
+        @self.handler.command("add", "Add numbers")
+        async def add(ctx, a: int, b: int):
+            self.log.append(("add", a + b))
+
+    def ran(self):
+        return [entry for entry in self.log if not isinstance(entry, tuple) or entry[0] == "add"]
+
+    def events(self, name):
+        return [entry for entry in self.log if isinstance(entry, tuple) and entry[0] == name]
+
+    async def test_hidden_trigger_only_hides_exact_trigger(self):
+        self.overlay.set(1, GuildOverrides(aliases={"t": None, "tags": "tags"}))
+        for _ in range(5):
+            await self.handler.on_message(make_message("!tags"))
+        self.assertEqual(self.ran(), ["tags"] * 5)
+
+        await self.handler.on_message(make_message("!t"))
+        self.assertEqual(len(self.events("CommandNotFound")), 1)
+
+    async def test_hidden_trigger_does_not_hide_longer_registered_alias(self):
+        self.overlay.set(1, GuildOverrides(aliases={"t": None}))
+        await self.handler.on_message(make_message("!tags"))
+        self.assertEqual(self.ran(), ["tags"])
+
+    async def test_longest_guild_trigger_wins(self):
+        self.overlay.set(1, GuildOverrides(aliases={"g": "add", "greet": "hello"}))
+        await self.handler.on_message(make_message("!greet"))
+        await self.handler.on_message(make_message("!g 1 2"))
+        self.assertEqual(self.ran(), ["hello", ("add", 3)])
+
+    async def test_rename_and_disable(self):
+        self.overlay.set(1, GuildOverrides(disabled=frozenset({"add"}), aliases={"greet": "hello", "hello": None}))
+        await self.handler.on_message(make_message("!greet"))
+        await self.handler.on_message(make_message("!hello"))
+        await self.handler.on_message(make_message("!add 1 2"))
+        await self.handler.on_message(make_message("!add 1 2", guild_id=2))
+        self.assertEqual(self.ran(), ["hello", ("add", 3)])
+        self.assertEqual(len(self.events("CommandNotFound")), 2)
+
+    async def test_restriction_runs_before_conversion(self):
+        self.overlay.set(1, GuildOverrides(restrictions={"add": GuildRestriction(channels=frozenset({99}))}))
+        await self.handler.on_message(make_message("!add x y"))
+        self.assertEqual(self.events("ArgumentCastingError"), [])
+        self.assertEqual(self.events("InvalidPermissions")[0][1], "CHANNEL")
+
+
+class GuildOverlayLoadingTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_gets_share_one_load(self):
+        calls = []
+
+        async def loader(guild_id):
+            calls.append(guild_id)
+            await asyncio.sleep(0.01)
+            return GuildOverrides(disabled=frozenset({"echo"}))
+
+        overlay = GuildOverlay(loader)
+        results = await asyncio.gather(*(overlay.get(1) for _ in range(5)))
+        self.assertEqual(calls, [1])
+        self.assertTrue(all(result is results[0] for result in results))
+
+    async def test_loader_error_falls_back_to_empty_overrides(self):
+        async def loader(guild_id):
+            raise RuntimeError("database down")
+
+        log = []
+        handler = await make_handler(log, guild_overlay=GuildOverlay(loader))
+
+        @handler.command("hello", "Say hello")
+        async def hello(ctx):
+            log.append("hello")
+
+        with self.assertLogs("botcontroller.guilds", level="ERROR"):
+            await handler.on_message(make_message("!hello"))
+        self.assertIn("hello", log)
+
+    async def test_cache_is_bounded(self):
+        calls = []
+
+        async def loader(guild_id):
+            calls.append(guild_id)
+            return None
+
+        overlay = GuildOverlay(loader, max_size=2)
+        for guild_id in (1, 2, 3, 1):
+            await overlay.get(guild_id)
+        self.assertEqual(calls, [1, 2, 3, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
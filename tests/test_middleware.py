@@ -0,0 +1,164 @@
+import unittest
+
+from botcontroller import Command, MiddlewareStage
+
+from .fakes import make_handler, make_message
+
+
+class MiddlewareShortCircuitTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.log = []
+        self.handler = await make_handler(self.log)
+
+        @self.handler.command("add", "Add numbers")
+        async def add(ctx, a: int, b: int):
+            self.log.append("add")
+
+    def stop_at(self, stage, name):
+        async def middleware(ctx):
+            self.log.append(name)
+            return False
+
+        self.handler.Middleware.add(stage, middleware)
+
+    def record_at(self, stage, name):
+        async def middleware(ctx):
+            self.log.append(name)
+
+        self.handler.Middleware.add(stage, middleware)
+
+    def event_names(self):
+        return [entry[0] for entry in self.log if isinstance(entry, tuple)]
+
+    async def test_before_routing(self):
+        self.stop_at(MiddlewareStage.BeforeRouting, "stop")
+        self.record_at(MiddlewareStage.BeforeRouting, "next")
+        await self.handler.on_message(make_message("!missing"))
+        self.assertEqual(self.log, ["stop"])
+
+    async def test_before_convert_runs_before_arguments_are_cast(self):
+        self.stop_at(MiddlewareStage.BeforeConvert, "stop")
+        await self.handler.on_message(make_message("!add x y"))
+        self.assertEqual(self.log, ["stop"])
+
+    async def test_before_execute(self):
+        self.stop_at(MiddlewareStage.BeforeExecute, "stop")
+        self.record_at(MiddlewareStage.BeforeExecute, "next")
+        await self.handler.on_message(make_message("!add 1 2"))
+        self.assertEqual(self.log, ["stop"])
+
+    async def test_after_execute_suppresses_command_received(self):
+        # Intended: returning False from after_execute marks the command as handled.
+        self.stop_at(MiddlewareStage.AfterExecute, "stop")
+        self.record_at(MiddlewareStage.AfterExecute, "next")
+        await self.handler.on_message(make_message("!add 1 2"))
+        self.assertEqual(self.log, ["add", "stop"])
+
+    async def test_no_short_circuit_runs_every_stage(self):
+        for stage in MiddlewareStage:
+            self.record_at(stage, stage.value)
+        await self.handler.on_message(make_message("!add 1 2"))
+        self.assertEqual(
+            self.log[:5],
+            ["before_routing", "before_convert", "before_execute", "add", "after_execute"],
+        )
+        self.assertEqual(self.event_names(), ["CommandReceived"])
+
+
+class MiddlewareCompileTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.handler = await make_handler([])
+        self.middleware = self.handler.Middleware
+
+        @self.handler.command("add", "Add numbers")
+        async def add(ctx, a: int, b: int):
+            pass
+
+        @self.handler.command("ping", "Ping")
+        async def ping(ctx):
+            pass
+
+        self.add = self.handler.registry.get("add")
+        self.ping = self.handler.registry.get("ping")
+
+    async def test_filter_by_name_and_predicate(self):
+        async def only_add(ctx):
+            pass
+
+        async def with_args(ctx):
+            pass
+
+        async def everywhere(ctx):
+            pass
+
+        self.middleware.before_execute(commands=["add"])(only_add)
+        self.middleware.before_execute(predicate=lambda cmd: bool(cmd.param_types))(with_args)
+        self.middleware.after_execute()(everywhere)
+
+        self.assertEqual(self.middleware.pipeline(self.add).before_execute, (only_add, with_args))
+        self.assertEqual(self.middleware.pipeline(self.ping).before_execute, ())
+        self.assertEqual(self.middleware.pipeline(self.ping).after_execute, (everywhere,))
+
+    async def test_single_command_name(self):
+        async def middleware(ctx):
+            pass
+
+        self.middleware.before_execute(commands="add")(middleware)
+        self.assertEqual(self.middleware.middlewares[MiddlewareStage.BeforeExecute][0].commands, frozenset({"add"}))
+        self.assertEqual(self.middleware.pipeline(self.add).before_execute, (middleware,))
+
+    async def test_predicate_is_evaluated_at_compile_time(self):
+        calls = []
+
+        async def middleware(ctx):
+            pass
+
+        self.middleware.before_execute(predicate=lambda cmd: calls.append(cmd.name) or True)(middleware)
+        for _ in range(3):
+            await self.handler.on_message(make_message("!ping"))
+        self.assertEqual(calls, ["ping"])
+
+    async def test_before_routing_cannot_be_filtered(self):
+        with self.assertRaises(ValueError):
+            self.middleware.add(MiddlewareStage.BeforeRouting, lambda ctx: None, commands=["add"])
+
+    async def test_invalidated_when_command_is_registered_again(self):
+        async def middleware(ctx):
+            pass
+
+        self.middleware.before_execute(predicate=lambda cmd: cmd.description == "New")(middleware)
+        self.assertEqual(self.middleware.pipeline(self.ping).before_execute, ())
+
+        @self.handler.command("ping", "New")
+        async def ping(ctx):
+            pass
+
+        self.assertEqual(self.middleware.pipeline(self.handler.registry.get("ping")).before_execute, (middleware,))
+
+    async def test_invalidated_by_add_commands(self):
+        async def middleware(ctx):
+            pass
+
+        async def tag(ctx):
+            pass
+
+        self.middleware.before_execute(predicate=lambda cmd: cmd.description == "Tag")(middleware)
+        self.assertEqual(self.middleware.pipeline(self.ping).before_execute, ())
+
+        self.handler.add_commands([("ping", "Tag", tag), Command.from_function("tag", "Tag", tag)])
+        self.assertEqual(self.middleware.pipeline(self.handler.registry.get("ping")).before_execute, (middleware,))
+        self.assertEqual(self.middleware.pipeline(self.handler.registry.get("tag")).before_execute, (middleware,))
+
+    async def test_invalidated_by_remove(self):
+        async def middleware(ctx):
+            pass
+
+        self.middleware.before_execute()(middleware)
+        self.assertEqual(self.middleware.pipeline(self.add).before_execute, (middleware,))
+
+        self.middleware.remove(MiddlewareStage.BeforeExecute, middleware)
+        self.assertEqual(self.middleware.pipeline(self.add).before_execute, ())
+
+
+if __name__ == "__main__":
+    unittest.main()
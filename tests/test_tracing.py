@@ -0,0 +1,182 @@
+import logging
+import threading
+import unittest
+
+from botcontroller import InMemorySpanExporter, SpanExportHandler, Tracer
+
+from .fakes import make_handler, make_message
+
+
+class TracingTest(unittest.IsolatedAsyncioTestCase):
+    async def run_messages(self, exporter, *contents, sample_rates=None, allowed_users=None):
+        tracer = Tracer(sample_rates=sample_rates, handlers=[SpanExportHandler(exporter)])
+        log = []
+        handler = await make_handler(log, tracer=tracer)
+
+        async def add(ctx, a: int, b: int):
+            pass
+
+        if allowed_users is not None:
+            add = handler.Restricted.user(allowed_users)(add)
+        handler.command("add", "Add numbers")(add)
+
+        tracer.start()
+        try:
+            for content in contents:
+                await handler.on_message(make_message(content))
+        finally:
+            tracer.stop()
+
+    async def test_spans_share_trace_id_and_link_to_parents(self):
+        exporter = InMemorySpanExporter()
+        await self.run_messages(exporter, "!add 1 2")
+        spans = {span["name"]: span for span in exporter.get_finished_spans()}
+
+        self.assertEqual(
+            set(spans),
+            {"message", "routing", "conversion", "execution", "event.CommandReceived"},
+        )
+        self.assertEqual(len({span["trace_id"] for span in spans.values()}), 1)
+
+        root = spans["message"]
+        self.assertIsNone(root["parent_span_id"])
+        for name in ("routing", "conversion", "execution", "event.CommandReceived"):
+            self.assertEqual(spans[name]["parent_span_id"], root["span_id"], name)
+        self.assertEqual(spans["routing"]["attributes"]["command"], "add")
+
+    async def test_restricted_manager_checks_get_a_span(self):
+        exporter = InMemorySpanExporter()
+        await self.run_messages(exporter, "!add 1 2", "!add 1 2", allowed_users=[100])
+        spans = exporter.get_finished_spans()
+        restrictions = [span for span in spans if span["name"] == "restrictions"]
+        executions = {span["span_id"]: span for span in spans if span["name"] == "execution"}
+
+        self.assertEqual(len(restrictions), 2)
+        for span in restrictions:
+            self.assertEqual(span["attributes"]["type"], "USER")
+            self.assertIn(span["parent_span_id"], executions)
+        self.assertEqual([span["name"] for span in spans].count("event.CommandReceived"), 2)
+
+    async def test_failed_restriction_is_traced(self):
+        exporter = InMemorySpanExporter()
+        await self.run_messages(exporter, "!add 1 2", allowed_users=[5])
+        names = [span["name"] for span in exporter.get_finished_spans()]
+        self.assertIn("restrictions", names)
+        self.assertIn("event.InvalidPermissions", names)
+
+    async def test_each_message_gets_its_own_trace(self):
+        exporter = InMemorySpanExporter()
+        await self.run_messages(exporter, "!add 1 2", "!add 3 4")
+        roots = [span for span in exporter.get_finished_spans() if span["name"] == "message"]
+        self.assertEqual(len(roots), 2)
+        self.assertNotEqual(roots[0]["trace_id"], roots[1]["trace_id"])
+
+    async def test_per_event_sample_rates(self):
+        exporter = InMemorySpanExporter()
+        await self.run_messages(exporter, "!add 1 2", "!add x 2", sample_rates={"event.CommandReceived": 0.0})
+        names = [span["name"] for span in exporter.get_finished_spans()]
+        self.assertNotIn("event.CommandReceived", names)
+        self.assertIn("event.ArgumentCastingError", names)
+        self.assertEqual(names.count("message"), 2)
+
+    async def test_unsampled_root_drops_whole_trace(self):
+        exporter = InMemorySpanExporter()
+        await self.run_messages(exporter, "!add 1 2", sample_rates={"message": 0.0})
+        self.assertEqual(exporter.get_finished_spans(), [])
+
+    async def test_spans_are_exported_in_batches(self):
+        batches = []
+
+        class BatchExporter:
+            def export(self, spans):
+                batches.append(list(spans))
+
+        tracer = Tracer(handlers=[SpanExportHandler(BatchExporter(), max_batch_size=4, flush_interval=60)])
+        log = []
+        handler = await make_handler(log, tracer=tracer)
+
+        @handler.command("add", "Add numbers")
+        async def add(ctx, a: int, b: int):
+            pass
+
+        tracer.start()
+        for _ in range(3):
+            await handler.on_message(make_message("!add 1 2"))
+        tracer.stop()
+
+        self.assertEqual(sum(len(batch) for batch in batches), 15)
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 4, 3])
+
+    def test_full_queue_drops_records(self):
+        release = threading.Event()
+
+        class BlockingHandler(logging.Handler):
+            def __init__(self):
+                super().__init__()
+                self.records = 0
+
+            def emit(self, record):
+                release.wait(5)
+                self.records += 1
+
+        blocking = BlockingHandler()
+        tracer = Tracer(handlers=[blocking], max_queue_size=2)
+        tracer.start()
+        try:
+            for _ in range(20):
+                with tracer.start_span("message"):
+                    pass
+        finally:
+            release.set()
+            tracer.stop()
+
+        self.assertGreater(tracer.dropped_records, 0)
+        self.assertEqual(blocking.records + tracer.dropped_records, 20)
+
+    def test_stop_restores_logger_state(self):
+        logger = logging.getLogger("botcontroller.tests.tracing")
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+
+        tracer = Tracer(handlers=[logging.NullHandler()], logger_name=logger.name)
+        tracer.start()
+        self.assertEqual(logger.level, logging.DEBUG)
+        tracer.stop()
+
+        self.assertEqual(logger.level, logging.WARNING)
+        self.assertFalse(logger.propagate)
+        self.assertEqual(logger.handlers, [])
+
+
+class OpenTelemetryExportTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        try:
+            from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter as OTelInMemorySpanExporter
+        except ImportError:
+            self.skipTest("opentelemetry-sdk is not installed")
+        self.exporter = OTelInMemorySpanExporter()
+
+    async def test_sdk_exporter_receives_readable_spans(self):
+        tracer = Tracer(handlers=[SpanExportHandler(self.exporter)])
+        log = []
+        handler = await make_handler(log, tracer=tracer)
+
+        @handler.command("hello", "Say hello")
+        async def hello(ctx):
+            pass
+
+        tracer.start()
+        await handler.on_message(make_message("!hello", guild_id=None))
+        tracer.stop()
+
+        spans = {span.name: span for span in self.exporter.get_finished_spans()}
+        root = spans["message"]
+        self.assertIsNone(root.parent)
+        self.assertNotIn("guild_id", root.attributes)
+        self.assertEqual(spans["execution"].parent.span_id, root.context.span_id)
+        self.assertEqual(spans["execution"].context.trace_id, root.context.trace_id)
+        self.assertEqual(spans["execution"].attributes["command"], "hello")
+
+
+if __name__ == "__main__":
+    unittest.main()